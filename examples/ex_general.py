@@ -49,10 +49,8 @@ if __name__ == '__main__':
         avg_num_jobs += qs.get_avg_num_jobs()
         avg_delay += qs.get_avg_delay()
 
-        if qs.trace:
-            new_max_num_jobs = max(map(lambda x: (x[1] + x[2]), qs.trace))
-            if max_num_jobs < new_max_num_jobs:
-                max_num_jobs = new_max_num_jobs
+        if max_num_jobs < qs.max_num_jobs:
+            max_num_jobs = qs.max_num_jobs
 
         print 'Output:', map(lambda x: x.source_label, qs.output_channel)
 
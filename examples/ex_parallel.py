@@ -0,0 +1,65 @@
+#
+# Copyright European Organization for Nuclear Research (CERN)
+#           National Research Centre "Kurchatov Institute"
+#           Rutgers University
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+
+import random
+
+from multiprocessing import Pool, cpu_count
+
+from qss import QSS, stream_generator
+from qss.constants import StreamName
+
+
+ARRIVAL_RATE = 22./72
+SERVICE_RATE = 1./3
+NUM_NODES = 100  # M/M/NUM_NODES
+
+TIME_LIMIT = 1000.
+NUM_ATTEMPTS = 100
+
+
+def run_attempt(seed):
+    """
+    Run one independent simulation (attempt) with the defined seed.
+
+    @param seed: Seed for the random generator (per attempt).
+    @type seed: int
+    @return: Average number of jobs, average delay, maximum number of jobs.
+    @rtype: tuple
+    """
+    # governs the stream sampling in every worker, including the
+    # numpy-backed path (qss.stream seeds it from the stdlib generator)
+    random.seed(seed)
+
+    qs = QSS(num_nodes=NUM_NODES)
+    qs.run(streams=[stream_generator(arrival_rate=ARRIVAL_RATE,
+                                     execution_rate=SERVICE_RATE,
+                                     source=StreamName.Main,
+                                     time_limit=TIME_LIMIT)])
+
+    return qs.get_avg_num_jobs(), qs.get_avg_delay(), qs.max_num_jobs
+
+
+if __name__ == '__main__':
+
+    pool = Pool(cpu_count())
+    try:
+        results = pool.map(run_attempt, range(NUM_ATTEMPTS))
+    finally:
+        pool.close()
+        pool.join()
+
+    avg_num_jobs = sum([x[0] for x in results]) / NUM_ATTEMPTS
+    avg_delay = sum([x[1] for x in results]) / NUM_ATTEMPTS
+    max_num_jobs = max([x[2] for x in results])
+
+    print 'AVG number of jobs: {0} (max: {1}); AVG delay: {2}'.format(
+        avg_num_jobs, max_num_jobs, avg_delay)
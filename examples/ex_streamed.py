@@ -30,22 +30,25 @@ TIME_LIMIT = 1000.
 
 def stream_generator(arrival_rate, execution_time, nodes_num_rate, time_limit):
 
-    def get_random_by_poisson(rate):
-        return (-1. / rate) * math.log(1. - random.random())
+    # hoisted bindings and precomputed scales (the loop body runs
+    # once per generated job, i.e., ~100k times for the default set up)
+    log, rnd, normalvariate = math.log, random.random, random.normalvariate
 
-    def get_random_by_normal(mean_val):
-        return random.normalvariate(mean_val, mean_val/2)
+    arrival_scale = -1. / arrival_rate
+    nodes_scale = -1. / nodes_num_rate
+    execution_sigma = execution_time / 2
 
-    next_arrival_timestamp = get_random_by_poisson(arrival_rate)
+    next_arrival_timestamp = arrival_scale * log(1. - rnd())
     while time_limit and next_arrival_timestamp < time_limit:
 
-        num_nodes = int(round(get_random_by_poisson(nodes_num_rate), 0)) + 1
+        num_nodes = int(round(nodes_scale * log(1. - rnd()), 0)) + 1
         yield Job(arrival_timestamp=next_arrival_timestamp,
-                  execution_time=get_random_by_normal(execution_time),
+                  execution_time=normalvariate(execution_time,
+                                               execution_sigma),
                   num_nodes=num_nodes,
                   source='null')
 
-        next_arrival_timestamp += get_random_by_poisson(arrival_rate)
+        next_arrival_timestamp += arrival_scale * log(1. - rnd())
 
 
 if __name__ == '__main__':
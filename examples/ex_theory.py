@@ -13,40 +13,57 @@
 # - Mikhail Titov, <mikhail.titov@cern.ch>, 2017
 #
 
-import math
-
 from decimal import Decimal
 
 
-ARRIVAL_RATE = 22./72
-SERVICE_RATE = 1./3
+ARRIVAL_RATE = Decimal(repr(22./72))
+SERVICE_RATE = Decimal(repr(1./3))
 NUM_NODES = 1000  # M/M/NUM_NODES
 
+_ONE = Decimal(1)
+
+_erlang_cache = {}
+
+
+def erlang_terms(n, a_rate, s_rate):
+    """
+    Get the sum of the first n Erlang terms (r^i/i! for i in [0, n)) and
+    the tail term (r^n/(n! * (1 - rho))), where r = a_rate/s_rate.
+
+    Each term is derived from the previous one (term_i = term_{i-1} * r/i),
+    thus no factorial or power is computed.
+    """
+    output = _erlang_cache.get((n, a_rate, s_rate))
+
+    if output is None:
+        rho = a_rate / (n * s_rate)
+        r = a_rate / s_rate
+
+        term, terms_sum = _ONE, _ONE
+        for i in range(1, n):
+            term = term * r / i
+            terms_sum += term
+
+        tail = term * r / n / (_ONE - rho)
+        output = _erlang_cache[(n, a_rate, s_rate)] = (terms_sum, tail)
+
+    return output
+
 
 def p_zero(n, a_rate, s_rate):
-    rho = a_rate / (n * s_rate)
-    return (
-        Decimal(1) / (
-            (((a_rate / s_rate)**n) / (math.factorial(n) * (Decimal(1) - rho)))
-            + sum([
-                (((a_rate / s_rate)**i) / math.factorial(i)) for i in range(n)
-            ])
-        )
-    )
+    terms_sum, tail = erlang_terms(n, a_rate, s_rate)
+    return _ONE / (tail + terms_sum)
 
 
 def p_q(n, a_rate, s_rate):
-    rho = a_rate / (n * s_rate)
-    return (
-        p_zero(n, a_rate, s_rate) *
-        (((a_rate / s_rate)**n) / (math.factorial(n) * (Decimal(1) - rho)))
-    )
+    terms_sum, tail = erlang_terms(n, a_rate, s_rate)
+    return tail / (tail + terms_sum)
 
 
 def num_jobs(n, a_rate, s_rate):
     rho = a_rate / (n * s_rate)
     return (
-        ((rho * p_q(n, a_rate, s_rate)) / (Decimal(1) - rho))
+        ((rho * p_q(n, a_rate, s_rate)) / (_ONE - rho))
         + (a_rate / s_rate)
     )
 
@@ -54,16 +71,12 @@ def num_jobs(n, a_rate, s_rate):
 def delay(n, a_rate, s_rate):
     return (
         ((p_q(n, a_rate, s_rate)) / ((n * s_rate) - a_rate))
-        + (Decimal(1) / s_rate)
+        + (_ONE / s_rate)
     )
 
 
 if __name__ == '__main__':
 
     print 'AVG number of jobs: {0}; AVG delay: {1}'.format(
-        num_jobs(NUM_NODES,
-                 Decimal('{0}'.format(ARRIVAL_RATE)),
-                 Decimal('{0}'.format(SERVICE_RATE))),
-        delay(NUM_NODES,
-              Decimal('{0}'.format(ARRIVAL_RATE)),
-              Decimal('{0}'.format(SERVICE_RATE))))
+        num_jobs(NUM_NODES, ARRIVAL_RATE, SERVICE_RATE),
+        delay(NUM_NODES, ARRIVAL_RATE, SERVICE_RATE))
@@ -14,7 +14,17 @@
 # - Alexey Poyda, <poyda@wdcb.ru>, 2017
 #
 
+from __future__ import print_function
+
+import csv
 import time
+
+from array import array
+
+from heapq import (heappush as _heappush,
+                   heappop as _heappop,
+                   heappushpop as _heappushpop)
+from collections import defaultdict
 from datetime import timedelta
 
 from .stream import stream_generator, stream_generator_by_file
@@ -22,6 +32,18 @@ from .stream import stream_generator, stream_generator_by_file
 from .core import QueueManager, NodeManager, ScheduleManager
 from .core.constants import ActionCode, ServiceState
 
+# hoisted enum values (EnumTypes resolves attributes through a dict
+# lookup per access, which is wasteful on the per-event paths)
+ACTION_ARRIVAL = ActionCode.Arrival
+ACTION_SUBMISSION = ActionCode.Submission
+ACTION_COMPLETION = ActionCode.Completion
+STATE_ARRIVAL = ServiceState.Arrival
+STATE_COMPLETION = ServiceState.Completion
+STATE_STOP = ServiceState.Stop
+
+# monotonic timer for verbose measurements (perf_counter since py3.3)
+_timer = getattr(time, 'perf_counter', time.time)
+
 try:
     from .policy import QUEUE_POLICY
 except ImportError:
@@ -32,9 +54,28 @@ class QSS(object):
 
     """Queueing System Simulator."""
 
+    __slots__ = ('__current_state', '__current_time', '__time_limit',
+                 '__job_generators', '__input_jobs', '__arrival_heap',
+                 '__arrival_gid', '__arrival_timestamp',
+                 '__queue', '__node_manager', '__scheduler',
+                 '__schedule_recreation', '__new_priority_arrival',
+                 '__action_handlers', '__submission_impl',
+                 '__output', '__keep_output',
+                 '__trace_times', '__trace_queue_lengths',
+                 '__trace_num_processing', '__trace_actions',
+                 '__sum_delay', '__sum_node_time', '__num_completed',
+                 '__max_num_jobs', '__delay_per_source',
+                 '__node_time_per_source',
+                 '__acc_num_jobs_dt', '__acc_queue_length_dt',
+                 '__first_trace_time', '__previous_trace_time',
+                 '__previous_queue_length', '__previous_num_processing',
+                 '__output_file', '__output_fh', '__output_csv',
+                 '__trace_file', '__trace_fh')
+
     def __init__(self, num_nodes, queue_limit=None,
                  use_queue_buffer=False, use_scheduler=False,
-                 time_limit=None, output_file=None, trace_file=None):
+                 time_limit=None, output_file=None, trace_file=None,
+                 keep_output=True):
         """
         Initialization.
 
@@ -52,6 +93,11 @@ class QSS(object):
         @type output_file: str/None
         @param trace_file: Name of file for trace info (addon for trace).
         @type trace_file: str/None
+        @param keep_output: Flag to keep processed jobs in output_channel
+                            (set to False to bound memory for long runs
+                            whose results go to output_file; aggregated
+                            statistics stay available).
+        @type keep_output: bool
         """
         self.__current_state = None
         self.__current_time = 0.
@@ -59,6 +105,7 @@ class QSS(object):
 
         self.__job_generators = []
         self.__input_jobs = []
+        self.__arrival_heap = []  # (<arrival_timestamp>, <gid>)
         self.__arrival_gid = None
         self.__arrival_timestamp = None
 
@@ -73,11 +120,48 @@ class QSS(object):
         self.__schedule_recreation = False
         self.__new_priority_arrival = False
 
+        # <state> -> <action handler> (Stop/None states are not mapped)
+        self.__action_handlers = {
+            STATE_ARRIVAL: self.__arrival,
+            STATE_COMPLETION: self.__completion}
+
+        # mode-specific submission (fixed for the simulator's lifetime)
+        self.__submission_impl = self.__submission_scheduled \
+            if use_scheduler else self.__submission_fcfs
+
         self.__output = []
-        self.__trace = []
+        self.__keep_output = keep_output
+
+        # trace data as parallel columns (one record per index);
+        # numeric columns are typed arrays (8 bytes per timestamp
+        # instead of a boxed float object per list slot)
+        self.__trace_times = array('d')
+        self.__trace_queue_lengths = array('l')
+        self.__trace_num_processing = array('l')
+        self.__trace_actions = []
+
+        self.__sum_delay = 0.
+        self.__sum_node_time = 0.
+        self.__num_completed = 0
+        self.__max_num_jobs = 0
+
+        # <source> -> [<sum_delay>, <num_completed_jobs>]
+        self.__delay_per_source = defaultdict(lambda: [0., 0])
+        self.__node_time_per_source = defaultdict(float)
+
+        # time-weighted accumulators over the trace records
+        self.__acc_num_jobs_dt = 0.
+        self.__acc_queue_length_dt = 0.
+        self.__first_trace_time = None
+        self.__previous_trace_time = None
+        self.__previous_queue_length = 0
+        self.__previous_num_processing = 0
 
         self.__output_file = output_file
+        self.__output_fh = None
+        self.__output_csv = None
         self.__trace_file = trace_file
+        self.__trace_fh = None
 
     @property
     def output_channel(self):
@@ -94,17 +178,33 @@ class QSS(object):
         """
         Get trace data.
 
-        @return: Trace data.
-        @rtype: list
+        @return: Trace data (time, queue length, processing jobs, action).
+        @rtype: list of tuples
         """
-        return self.__trace
+        return list(zip(self.__trace_times,
+                        self.__trace_queue_lengths,
+                        self.__trace_num_processing,
+                        self.__trace_actions))
 
-    def __set_next_arrival_job(self, gid):
+    @property
+    def max_num_jobs(self):
+        """
+        Get the maximum number of jobs that were in the system simultaneously.
+
+        @return: Maximum number of jobs.
+        @rtype: int
+        """
+        return self.__max_num_jobs
+
+    def __set_next_arrival_job(self, gid, pop_current=False):
         """
         Define the next arrival job (by the corresponding generator).
 
         @param gid: Generator id.
         @type gid: int
+        @param pop_current: Flag to remove the current (served) arrival
+                            from the heap while the new one is pushed.
+        @type pop_current: bool
         """
         next_gid = len(self.__input_jobs)
         if gid < next_gid:
@@ -115,38 +215,60 @@ class QSS(object):
             raise Exception('Generator id is out of limit.')
 
         try:
-            self.__input_jobs[gid] = self.__job_generators[gid].next()
+            job = next(self.__job_generators[gid])
         except StopIteration:
-            self.__input_jobs[gid] = None
+            job = None
+
+        self.__input_jobs[gid] = job
 
-        self.__arrival_gid, self.__arrival_timestamp = None, None
-        for idx, job in enumerate(self.__input_jobs):
-            if (job and (not self.__arrival_timestamp
-                         or job.arrival_timestamp < self.__arrival_timestamp)):
-                self.__arrival_gid, self.__arrival_timestamp = \
-                    idx, job.arrival_timestamp
+        if len(self.__job_generators) == 1:
+            # single-stream fast path (no heap bookkeeping is needed)
+            if job is not None:
+                self.__arrival_gid = gid
+                self.__arrival_timestamp = job.arrival_timestamp
+            else:
+                self.__arrival_gid, self.__arrival_timestamp = None, None
+            return
+
+        if pop_current and self.__arrival_heap:
+            if job is not None:
+                _heappushpop(self.__arrival_heap,
+                             (job.arrival_timestamp, gid))
+            else:
+                _heappop(self.__arrival_heap)
+        elif job is not None:
+            _heappush(self.__arrival_heap,
+                      (job.arrival_timestamp, gid))
+
+        if self.__arrival_heap:
+            self.__arrival_timestamp, self.__arrival_gid = \
+                self.__arrival_heap[0]
+        else:
+            self.__arrival_gid, self.__arrival_timestamp = None, None
 
     def __set_next_timestamp(self):
         """
         Define the next timestamp based on the closest action that is scheduled.
         """
+        arrival_timestamp = self.__arrival_timestamp
         next_release_timestamp = self.__node_manager.next_release_timestamp
 
-        if not self.__arrival_timestamp and not next_release_timestamp:
-            self.__current_state = ServiceState.Stop
+        if arrival_timestamp is None and next_release_timestamp is None:
+            self.__current_state = STATE_STOP
 
         else:
-            if (not next_release_timestamp or
-                    next_release_timestamp > self.__arrival_timestamp > 0.):
-                self.__current_time = self.__arrival_timestamp
-                self.__current_state = ServiceState.Arrival
-            elif next_release_timestamp:
+            if arrival_timestamp is not None and (
+                    next_release_timestamp is None or
+                    next_release_timestamp > arrival_timestamp):
+                self.__current_time = arrival_timestamp
+                self.__current_state = STATE_ARRIVAL
+            else:
                 self.__current_time = next_release_timestamp
-                self.__current_state = ServiceState.Completion
+                self.__current_state = STATE_COMPLETION
 
-            if (self.__time_limit and self.__current_time and
+            if (self.__time_limit and
                     self.__time_limit < self.__current_time):
-                self.__current_state = ServiceState.Stop
+                self.__current_state = STATE_STOP
 
     def __next_action(self, verbose=False):
         """
@@ -157,20 +279,13 @@ class QSS(object):
         @return: Workflow status code.
         @rtype: int
         """
-        output = 0
-
-        if self.__current_state == ServiceState.Arrival:
-            self.__arrival(verbose=verbose)
-            self.__submission(verbose=verbose)
-
-        elif self.__current_state == ServiceState.Completion:
-            self.__completion(verbose=verbose)
-            self.__submission(verbose=verbose)
+        handler = self.__action_handlers.get(self.__current_state)
+        if handler is None:
+            return 1 if self.__current_state == STATE_STOP else 0
 
-        elif self.__current_state == ServiceState.Stop:
-            output = 1
-
-        return output
+        handler(verbose=verbose)
+        self.__submission(verbose=verbose)
+        return 0
 
     def __scheduling(self, job, verbose=False):
         """
@@ -184,14 +299,13 @@ class QSS(object):
         if self.__scheduler is not None:
             self.__scheduler.add(job=job, current_time=self.__current_time)
 
-            job_id = id(job)
-            if (id(self.__queue.show_last()) != job_id
-                    and not self.__scheduler.is_backfill_job(job_id)):
+            if (self.__queue.show_last() is not job
+                    and not self.__scheduler.is_backfill_job(job.seq)):
 
                 self.__new_priority_arrival = True
 
                 if verbose:
-                    print 'New job with high priority is arrived.'
+                    print('New job with high priority is arrived.')
 
     def __arrival(self, verbose=False):
         """
@@ -202,91 +316,124 @@ class QSS(object):
         """
         while self.__arrival_timestamp == self.__current_time:
 
-            job = self.__input_jobs[self.__arrival_gid]
+            gid = self.__arrival_gid
+            job = self.__input_jobs[gid]
+
             status = self.__queue.add(job=job, current_time=self.__current_time)
-            self.__set_next_arrival_job(gid=self.__arrival_gid)
+            self.__set_next_arrival_job(gid=gid, pop_current=True)
 
             if not status:
                 self.__scheduling(job=job, verbose=verbose)
 
         self.__trace_update(verbose=verbose,
-                            action_code=ActionCode.Arrival)
+                            action_code=ACTION_ARRIVAL)
 
     def __submission(self, verbose=False):
         """
-        Get jobs from the queue and submit them to idle service nodes.
+        Get jobs from the queue and submit them to idle service nodes
+        (the mode-specific implementation is bound at construction).
+
+        @param verbose: Flag to get (show) logs.
+        @type verbose: bool
+        """
+        if self.__submission_impl(verbose=verbose):
+            self.__trace_update(verbose=verbose,
+                                action_code=ACTION_SUBMISSION)
+
+    def __submission_scheduled(self, verbose=False):
+        """
+        Submit jobs according to the created schedule (backfill mode).
 
         @param verbose: Flag to get (show) logs.
         @type verbose: bool
+        @return: Flag that at least one job was submitted.
+        @rtype: bool
         """
         had_submission = False
 
-        if self.__scheduler is not None:
+        scheduler = self.__scheduler
+        queue, node_manager = self.__queue, self.__node_manager
+        current_time = self.__current_time
 
-            while self.__scheduler.has_scheduled_elements(
-                    current_time=self.__current_time):
+        while scheduler.has_scheduled_elements(
+                current_time=current_time):
 
-                if self.__new_priority_arrival:
-                    self.__schedule_recreation = True
-                    self.__new_priority_arrival = False
+            if self.__new_priority_arrival:
+                self.__schedule_recreation = True
+                self.__new_priority_arrival = False
 
-                if self.__schedule_recreation:
+            if self.__schedule_recreation:
 
-                    start_time = time.time()
+                if verbose:
+                    start_time = _timer()
 
-                    self.__scheduler.set_initial_busy_times(
-                        node_release_timestamps=
-                        self.__node_manager.get_scheduled_release_timestamps(),
-                        current_time=self.__current_time)
-                    self.__scheduler.create_schedule_by_queue(
-                        queue_iterator=self.__queue.iterator())
+                scheduler.set_initial_busy_times(
+                    node_release_timestamps=
+                    node_manager.get_scheduled_release_timestamps(),
+                    current_time=current_time)
+                scheduler.create_schedule_by_queue(
+                    queue_iterator=queue.iterator())
 
-                    self.__schedule_recreation = False
+                self.__schedule_recreation = False
 
-                    if verbose:
-                        print 'Schedule is re-created ({0}).'.\
-                            format(timedelta(seconds=time.time() - start_time))
+                if verbose:
+                    print('Schedule is re-created ({0}).'.format(
+                        timedelta(seconds=_timer() - start_time)))
 
-                scheduled_elements = self.__scheduler.get_scheduled_elements(
-                    current_time=self.__current_time)
+            scheduled_elements = scheduler.get_scheduled_elements(
+                current_time=current_time)
 
-                for job_id, node_ids in scheduled_elements:
-                    self.__node_manager.assign_processing(
-                        job=self.__queue.pull(
-                            eid=0,
-                            job_id=job_id,
-                            current_time=self.__current_time),
-                        node_ids=node_ids,
-                        current_time=self.__current_time)
+            for job_id, node_ids in scheduled_elements:
+                node_manager.assign_processing(
+                    job=queue.pull(
+                        eid=0,
+                        job_id=job_id,
+                        current_time=current_time),
+                    node_ids=node_ids,
+                    current_time=current_time)
 
-                    queued_buffer_job = self.__queue.get_new_added_from_buffer(
-                        current_time=self.__current_time)
-                    if queued_buffer_job:
-                        self.__scheduling(job=queued_buffer_job,
-                                          verbose=verbose)
+                queued_buffer_job = queue.get_new_added_from_buffer(
+                    current_time=current_time)
+                if queued_buffer_job:
+                    self.__scheduling(job=queued_buffer_job,
+                                      verbose=verbose)
 
-                if scheduled_elements and not had_submission:
-                    had_submission = True
+            if scheduled_elements and not had_submission:
+                had_submission = True
 
-        else:
+        return had_submission
 
-            while (not self.__queue.is_empty
-                   and self.__node_manager.num_idle_nodes):
+    def __submission_fcfs(self, verbose=False):
+        """
+        Submit jobs from the queue head while they fit the idle nodes.
 
-                if not self.__node_manager.ready_for_processing(
-                        job=self.__queue.show_next()):
-                    break
+        @param verbose: Flag to get (show) logs.
+        @type verbose: bool
+        @return: Flag that at least one job was submitted.
+        @rtype: bool
+        """
+        had_submission = False
 
-                self.__node_manager.start_processing(
-                    job=self.__queue.get_next(current_time=self.__current_time),
-                    current_time=self.__current_time)
+        queue, node_manager = self.__queue, self.__node_manager
+        if queue.is_empty or not node_manager.num_idle_nodes:
+            return had_submission
 
-                if not had_submission:
-                    had_submission = True
+        current_time = self.__current_time
 
-        if had_submission:
-            self.__trace_update(verbose=verbose,
-                                action_code=ActionCode.Submission)
+        while not queue.is_empty and node_manager.num_idle_nodes:
+
+            jobs = queue.get_next_batch(
+                num_nodes=node_manager.num_idle_nodes,
+                current_time=current_time)
+            if not jobs:
+                break
+
+            node_manager.start_processing_batch(
+                jobs=jobs, current_time=current_time)
+
+            had_submission = True
+
+        return had_submission
 
     def __completion(self, verbose=False):
         """
@@ -304,29 +451,38 @@ class QSS(object):
             if self.__new_priority_arrival:
                 self.__schedule_recreation = True
                 self.__new_priority_arrival = False
-            else:
-                for job in completed_jobs:
-                    if job.scheduled_release_timestamp != job.release_timestamp:
-                        self.__schedule_recreation = True
-                        break
-
-        self.__output.extend(completed_jobs)
-
-        if self.__output_file and completed_jobs:
-            with open(self.__output_file, 'a') as f:
-                for job in completed_jobs:
-                    params = [str(job.arrival_timestamp),
-                              str(job.submission_timestamp),
-                              str(job.release_timestamp),
-                              str(job.num_nodes)]
-                    if job.source:
-                        params.append(job.source)
-                    if job.label:
-                        params.append(job.label)
-                    f.write(','.join(params) + '\n')
+            elif any(job.early_finish for job in completed_jobs):
+                self.__schedule_recreation = True
+
+        if self.__keep_output:
+            self.__output.extend(completed_jobs)
+
+        for job in completed_jobs:
+            node_time = job.num_nodes * job.execution_time
+
+            self.__sum_delay += job.delay
+            self.__sum_node_time += node_time
+            self.__num_completed += 1
+
+            delay_per_source = self.__delay_per_source[job.source]
+            delay_per_source[0] += job.delay
+            delay_per_source[1] += 1
+            self.__node_time_per_source[job.source] += node_time
+
+        if self.__output_csv is not None and completed_jobs:
+            for job in completed_jobs:
+                row = [job.arrival_timestamp,
+                       job.submission_timestamp,
+                       job.release_timestamp,
+                       job.num_nodes]
+                if job.source:
+                    row.append(job.source)
+                if job.label:
+                    row.append(job.label)
+                self.__output_csv.writerow(row)
 
         self.__trace_update(verbose=verbose,
-                            action_code=ActionCode.Completion)
+                            action_code=ACTION_COMPLETION)
 
     def __trace_update(self, verbose=False, action_code=None):
         """
@@ -335,26 +491,53 @@ class QSS(object):
         @param action_code: Code of the action.
         @type action_code: str/None
         """
-        self.__trace.append((self.__current_time,
-                             self.__queue.length,
-                             self.__node_manager.num_processing_jobs,
-                             action_code or '-'))
+        queue_length = self.__queue.length
+        num_processing = self.__node_manager.num_processing_jobs
+
+        num_jobs = queue_length + num_processing
+        if self.__max_num_jobs < num_jobs:
+            self.__max_num_jobs = num_jobs
+
+        if self.__previous_trace_time is None:
+            self.__first_trace_time = self.__current_time
+        else:
+            dt = self.__current_time - self.__previous_trace_time
+            self.__acc_queue_length_dt += self.__previous_queue_length * dt
+            self.__acc_num_jobs_dt += (self.__previous_queue_length +
+                                       self.__previous_num_processing) * dt
+
+        self.__previous_trace_time = self.__current_time
+        self.__previous_queue_length = queue_length
+        self.__previous_num_processing = num_processing
+
+        self.__trace_times.append(self.__current_time)
+        self.__trace_queue_lengths.append(queue_length)
+        self.__trace_num_processing.append(num_processing)
+        self.__trace_actions.append(action_code or '-')
 
         if verbose or self.__trace_file:
+            self.__trace_update_detailed(verbose=verbose)
 
-            detailed_trace_string = '{0:15f} - {1} - {2} - {3} - {4}'.format(
-                self.__current_time,
-                self.__queue.get_num_jobs_with_source_names(in_buffer=True),
-                self.__queue.get_num_jobs_with_source_names(),
-                self.__node_manager.get_num_jobs_with_source_names(),
-                self.__trace[-1][3])
+    def __trace_update_detailed(self, verbose=False):
+        """
+        Format and emit the detailed trace record (cold path that walks
+        the per-source counters of the queue and the node manager).
 
-            if verbose:
-                print detailed_trace_string
+        @param verbose: Flag to get (show) logs.
+        @type verbose: bool
+        """
+        detailed_trace_string = '%15f - %s - %s - %s - %s' % (
+            self.__current_time,
+            self.__queue.get_num_jobs_with_source_names(in_buffer=True),
+            self.__queue.get_num_jobs_with_source_names(),
+            self.__node_manager.get_num_jobs_with_source_names(),
+            self.__trace_actions[-1])
 
-            if self.__trace_file:
-                with open(self.__trace_file, 'a') as f:
-                    f.write(detailed_trace_string + '\n')
+        if verbose:
+            print(detailed_trace_string)
+
+        if self.__trace_fh is not None:
+            self.__trace_fh.write(detailed_trace_string + '\n')
 
     def __reset(self):
         """
@@ -364,6 +547,7 @@ class QSS(object):
         self.__current_time = 0.
 
         del self.__input_jobs[:]
+        del self.__arrival_heap[:]
         self.__arrival_gid = None
         self.__arrival_timestamp = None
 
@@ -371,7 +555,36 @@ class QSS(object):
         self.__node_manager.reset()
 
         del self.__output[:]
-        del self.__trace[:]
+        del self.__trace_times[:]
+        del self.__trace_queue_lengths[:]
+        del self.__trace_num_processing[:]
+        del self.__trace_actions[:]
+
+        self.__sum_delay = 0.
+        self.__sum_node_time = 0.
+        self.__num_completed = 0
+        self.__max_num_jobs = 0
+
+        self.__delay_per_source.clear()
+        self.__node_time_per_source.clear()
+
+        self.__acc_num_jobs_dt = 0.
+        self.__acc_queue_length_dt = 0.
+        self.__first_trace_time = None
+        self.__previous_trace_time = None
+        self.__previous_queue_length = 0
+        self.__previous_num_processing = 0
+
+    def __get_observed_duration(self):
+        """
+        Get the duration of the observed (traced) period.
+
+        @return: Duration (0. if the period is empty).
+        @rtype: float
+        """
+        if self.__previous_trace_time is not None:
+            return self.__previous_trace_time - self.__first_trace_time
+        return 0.
 
     def get_avg_num_jobs(self):
         """
@@ -382,13 +595,9 @@ class QSS(object):
         """
         output = 0.
 
-        if self.__trace and (self.__trace[-1][0] - self.__trace[0][0]):
-            for i in range(0, len(self.__trace) - 1):
-                num_jobs = self.__trace[i][1] + self.__trace[i][2]
-                dt = self.__trace[i + 1][0] - self.__trace[i][0]
-                output += num_jobs * dt
-
-            output = output / (self.__trace[-1][0] - self.__trace[0][0])
+        duration = self.__get_observed_duration()
+        if duration:
+            output = self.__acc_num_jobs_dt / duration
 
         return output
 
@@ -401,13 +610,9 @@ class QSS(object):
         """
         output = 0.
 
-        if self.__trace and (self.__trace[-1][0] - self.__trace[0][0]):
-            for i in range(0, len(self.__trace) - 1):
-                num_jobs_in_queue = self.__trace[i][1]
-                dt = self.__trace[i + 1][0] - self.__trace[i][0]
-                output += num_jobs_in_queue * dt
-
-            output = output / (self.__trace[-1][0] - self.__trace[0][0])
+        duration = self.__get_observed_duration()
+        if duration:
+            output = self.__acc_queue_length_dt / duration
 
         return output
 
@@ -422,12 +627,13 @@ class QSS(object):
         """
         output = 0.
 
-        if self.__output:
-
-            jobs = self.__output if not source else filter(
-                lambda x: x.source == source, self.__output)
+        if not source:
+            if self.__num_completed:
+                output = self.__sum_delay / self.__num_completed
 
-            output = reduce(lambda x, y: x + y.delay, jobs, 0.) / len(jobs)
+        elif source in self.__delay_per_source:
+            sum_delay, num_jobs = self.__delay_per_source[source]
+            output = sum_delay / num_jobs
 
         return output
 
@@ -442,12 +648,11 @@ class QSS(object):
         """
         output = 0.
 
-        if self.__output:
-            jobs = self.__output if not source else filter(
-                lambda x: x.source == source, self.__output)
+        if not source:
+            output = self.__sum_node_time
 
-            output = reduce(
-                lambda x, y: x + (y.num_nodes * y.execution_time), jobs, 0.)
+        elif source in self.__node_time_per_source:
+            output = self.__node_time_per_source[source]
 
         return output
 
@@ -455,24 +660,25 @@ class QSS(object):
         """
         Print statistics.
         """
-        if not self.trace and not self.output_channel:
+        if not self.__trace_times and not self.__output:
             return
 
-        print 'AVG number of jobs: {0}; AVG queue length: {1}'.format(
+        print('AVG number of jobs: {0}; AVG queue length: {1}'.format(
             self.get_avg_num_jobs(),
-            self.get_avg_len_queue())
-        print 'AVG delay: {0}'.format(self.get_avg_delay())
+            self.get_avg_len_queue()))
+        print('AVG delay: {0}'.format(self.get_avg_delay()))
 
-        print 'Utilization (nodes x time units): {0}'.format(
-            self.get_utilization_value())
+        print('Utilization (nodes x time units): {0}'.format(
+            self.get_utilization_value()))
 
         if self.__queue.num_dropped:
-            print 'Queue drop rate: {0}'.format(
+            print('Queue drop rate: {0}'.format(
                 float(self.__queue.num_dropped) /
-                (self.__queue.num_dropped + len(self.output_channel)))
+                (self.__queue.num_dropped + self.__num_completed)))
             d_pairs = self.__queue.get_num_dropped_with_source_names()
             if len(d_pairs) > 1:
-                print 'Dropped jobs in queue (per source): {0}'.format(d_pairs)
+                print('Dropped jobs in queue (per source): {0}'.format(
+                    d_pairs))
 
     def run(self, streams, verbose=False, output_file=None):
         """
@@ -497,8 +703,27 @@ class QSS(object):
         for gid in range(len(self.__job_generators)):
             self.__set_next_arrival_job(gid=gid)
 
-        while True:
-            status_code = self.__next_action(verbose=verbose)
-            if status_code:
-                break
-            self.__set_next_timestamp()
+        if self.__output_file:
+            self.__output_fh = open(self.__output_file, 'a', 1 << 20)
+            self.__output_csv = csv.writer(self.__output_fh,
+                                           lineterminator='\n')
+        if self.__trace_file:
+            self.__trace_fh = open(self.__trace_file, 'a', 1 << 20)
+
+        next_action = self.__next_action
+        set_next_timestamp = self.__set_next_timestamp
+
+        try:
+            while True:
+                status_code = next_action(verbose=verbose)
+                if status_code:
+                    break
+                set_next_timestamp()
+        finally:
+            if self.__output_fh is not None:
+                self.__output_fh.close()
+                self.__output_fh = None
+                self.__output_csv = None
+            if self.__trace_fh is not None:
+                self.__trace_fh.close()
+                self.__trace_fh = None
@@ -13,10 +13,22 @@
 # - Mikhail Titov, <mikhail.titov@cern.ch>, 2017-2018
 #
 
+from itertools import count
+
+# monotonic job ids (started from 1, so an id is always truthy)
+_next_seq = count(1)
+
 
 class Job(object):
 
-    def __init__(self, execution_time, num_nodes, source=None, **kwargs):
+    __slots__ = ('seq', 'wall_time', 'num_nodes', 'execution_time',
+                 'source', 'label', 'arrival_timestamp',
+                 '__submission_timestamp', 'release_timestamp',
+                 'scheduled_release_timestamp', 'wait_time', 'delay',
+                 'early_finish', 'group', 'priority')
+
+    def __init__(self, execution_time, num_nodes, source=None, wall_time=None,
+                 arrival_timestamp=None, priority=0., label=None):
         """
         Initialization.
 
@@ -26,68 +38,67 @@ class Job(object):
         @type num_nodes: int
         @param source: Input source/stream name.
         @type source: str/None
-
-        @keyword wall_time: Requested processing time.
-        @keyword arrival_timestamp: Arrival timestamp.
-        @keyword priority: Priority value.
-        @keyword label: Label (project) name.
+        @param wall_time: Requested processing time.
+        @type wall_time: float/None
+        @param arrival_timestamp: Arrival timestamp.
+        @type arrival_timestamp: float/None
+        @param priority: Priority value.
+        @type priority: float
+        @param label: Label (project) name.
+        @type label: str/None
         """
-        self.wall_time = kwargs.get('wall_time', execution_time)
+        self.seq = next(_next_seq)
+
+        self.wall_time = wall_time if wall_time is not None else execution_time
         self.num_nodes = num_nodes
 
         self.execution_time = execution_time
+        # constant flag that the job releases before its requested time
+        # (i.e. scheduled and actual release timestamps will not match)
+        self.early_finish = self.wall_time != execution_time
         self.source = source
-        self.label = kwargs.get('label')
+        self.label = label
 
-        self.arrival_timestamp = kwargs.get('arrival_timestamp')
+        self.arrival_timestamp = arrival_timestamp
         self.submission_timestamp = None
 
         self.group = None
-        self.priority = kwargs.get('priority', 0.)
-
-    @property
-    def release_timestamp(self):
-        """
-        Get timestamp when the job will be released.
-
-        @return: Release timestamp.
-        @rtype: float
-        """
-        if self.submission_timestamp:
-            return self.submission_timestamp + self.execution_time
-
-    @property
-    def scheduled_release_timestamp(self):
-        """
-        Get timestamp of the scheduled job release (based on wall_time).
-
-        @return: Scheduled release timestamp.
-        @rtype: float
-        """
-        if self.submission_timestamp:
-            return self.submission_timestamp + self.wall_time
+        self.priority = priority
 
     @property
-    def wait_time(self):
+    def submission_timestamp(self):
         """
-        Get job wait time (queue time).
+        Get timestamp when the job was submitted for processing.
 
-        @return: Wait time.
-        @rtype: float
+        @return: Submission timestamp.
+        @rtype: float/None
         """
-        if self.submission_timestamp:
-            return self.submission_timestamp - self.arrival_timestamp
+        return self.__submission_timestamp
 
-    @property
-    def delay(self):
+    @submission_timestamp.setter
+    def submission_timestamp(self, timestamp):
         """
-        Get job delay time.
+        Set submission timestamp and cache the derived values
+        (release/scheduled release timestamps, wait time and delay),
+        so repeated reads cost a plain attribute access.
 
-        @return: Delay time.
-        @rtype: float
+        @param timestamp: Submission timestamp.
+        @type timestamp: float/None
         """
-        if self.arrival_timestamp and self.submission_timestamp:
-            return self.wait_time + self.execution_time
+        self.__submission_timestamp = timestamp
+
+        if timestamp:
+            self.release_timestamp = timestamp + self.execution_time
+            self.scheduled_release_timestamp = timestamp + self.wall_time
+            self.wait_time = timestamp - self.arrival_timestamp \
+                if self.arrival_timestamp is not None else None
+            self.delay = self.wait_time + self.execution_time \
+                if self.arrival_timestamp else None
+        else:
+            self.release_timestamp = None
+            self.scheduled_release_timestamp = None
+            self.wait_time = None
+            self.delay = None
 
     def increase_priority(self, value):
         """
@@ -13,13 +13,18 @@
 # - Mikhail Titov, <mikhail.titov@cern.ch>, 2017-2018
 #
 
-from collections import defaultdict, Counter
+import heapq
+
+from collections import Counter
 
 from .constants import NodeState
 
 
 class NodeManager(object):
 
+    __slots__ = ('__nodes', '__num_nodes', '__num_busy', '__idle_ids',
+                 '__jobs_allocation', '__seq', '__num_jobs_per_source')
+
     def __init__(self, num_nodes):
         """
         Initialization.
@@ -27,9 +32,17 @@ class NodeManager(object):
         @param num_nodes: Number of service nodes.
         @type num_nodes: int
         """
-        self.__nodes = [NodeState.Idle for _ in range(num_nodes)]
-        self.__jobs_allocation = []  # (<job>, <node_ids>)
-        self.__num_jobs_per_source = defaultdict(int)
+        # per-node states packed as bytes (NodeState values are 0/1)
+        self.__nodes = bytearray(num_nodes)
+        self.__num_nodes = num_nodes
+        self.__num_busy = 0
+        self.__idle_ids = set(range(num_nodes))
+
+        # heap of (<release_timestamp>, <seq>, <job>, <node_ids>)
+        self.__jobs_allocation = []
+        self.__seq = 0
+
+        self.__num_jobs_per_source = Counter()
 
     @property
     def num_idle_nodes(self):
@@ -39,7 +52,7 @@ class NodeManager(object):
         @return: Number of not busy nodes.
         @rtype: int
         """
-        return Counter(self.__nodes)[NodeState.Idle]
+        return self.__num_nodes - self.__num_busy
 
     @property
     def num_busy_nodes(self):
@@ -49,7 +62,7 @@ class NodeManager(object):
         @return: Number of busy nodes.
         @rtype: int
         """
-        return Counter(self.__nodes)[NodeState.Busy]
+        return self.__num_busy
 
     @property
     def num_processing_jobs(self):
@@ -70,7 +83,7 @@ class NodeManager(object):
         @rtype: float
         """
         if self.__jobs_allocation:
-            return self.__jobs_allocation[0][0].release_timestamp
+            return self.__jobs_allocation[0][0]
 
     def get_scheduled_release_timestamps(self):
         """
@@ -81,9 +94,9 @@ class NodeManager(object):
         """
         output = {}
 
-        for job, node_ids in self.__jobs_allocation:
-            release_timestamp = job.scheduled_release_timestamp
-            output.update(dict(map(lambda x: (x, release_timestamp), node_ids)))
+        for _, _, job, node_ids in self.__jobs_allocation:
+            output.update(dict.fromkeys(node_ids,
+                                        job.scheduled_release_timestamp))
 
         return output
 
@@ -96,12 +109,7 @@ class NodeManager(object):
         @return: Flag that job processing can be started.
         @rtype: bool
         """
-        output = True
-
-        if self.num_idle_nodes < job.num_nodes:
-            output = False
-
-        return output
+        return job.num_nodes <= self.__num_nodes - self.__num_busy
 
     def start_processing(self, job, current_time):
         """
@@ -112,23 +120,33 @@ class NodeManager(object):
         @param current_time: Current time (timestamp from 0 to now).
         @type current_time: float
         """
-        if self.num_idle_nodes < job.num_nodes:
+        if self.__num_nodes - self.__num_busy < job.num_nodes:
             raise Exception('The number of requested nodes exceeds ' +
                             'the number of idle nodes.')
 
-        node_ids = []
-        for node_id, node_state in enumerate(self.__nodes):
-            if node_state == NodeState.Idle:
-                self.__nodes[node_id] = NodeState.Busy
-                node_ids.append(node_id)
-                if len(node_ids) == job.num_nodes:
-                    break
+        idle_ids = self.__idle_ids
+        node_ids = [idle_ids.pop() for _ in range(job.num_nodes)]
+        for node_id in node_ids:
+            self.__nodes[node_id] = NodeState.Busy
+
+        self.__num_busy += job.num_nodes
 
         job.submission_timestamp = current_time
-        self.__jobs_allocation.append((job, node_ids))
-        self.__jobs_allocation.sort(key=lambda x: x[0].release_timestamp)
+        self.__push_job_allocation(job=job, node_ids=node_ids)
         self.__increase_num_jobs_per_source(source=job.source)
 
+    def start_processing_batch(self, jobs, current_time):
+        """
+        Assign a batch of jobs to idle nodes for processing.
+
+        @param jobs: Job objects.
+        @type jobs: list
+        @param current_time: Current time (timestamp from 0 to now).
+        @type current_time: float
+        """
+        for job in jobs:
+            self.start_processing(job=job, current_time=current_time)
+
     def stop_processing(self, current_time):
         """
         Release scheduled service nodes and get finished jobs.
@@ -142,12 +160,14 @@ class NodeManager(object):
 
         while current_time == self.next_release_timestamp:
 
-            job, node_ids = self.__jobs_allocation.pop(0)
+            _, _, job, node_ids = heapq.heappop(self.__jobs_allocation)
             output.append(job)
             self.__decrease_num_jobs_per_source(source=job.source)
 
             for node_id in node_ids:
                 self.__nodes[node_id] = NodeState.Idle
+            self.__num_busy -= len(node_ids)
+            self.__idle_ids.update(node_ids)
 
         return output
 
@@ -166,33 +186,40 @@ class NodeManager(object):
             raise Exception('The number of requested nodes does not ' +
                             'correspond to the number of provided nodes.')
 
-        failed_node_id = None
-        for node_id in node_ids:
-
-            if self.__nodes[node_id] == NodeState.Busy:
-                failed_node_id = node_id
-                break
+        if not self.__idle_ids.issuperset(node_ids):
+            raise Exception('Already busy (assigned) node was requested again.')
 
+        self.__idle_ids.difference_update(node_ids)
+        for node_id in node_ids:
             self.__nodes[node_id] = NodeState.Busy
 
-        if failed_node_id:
-            for node_id in node_ids[:node_ids.index(failed_node_id)]:
-                self.__nodes[node_id] = NodeState.Idle
-            raise Exception('Already busy (assigned) node was requested again.')
+        self.__num_busy += len(node_ids)
 
         job.submission_timestamp = current_time
-        self.__jobs_allocation.append((job, node_ids))
-        self.__jobs_allocation.sort(key=lambda x: x[0].release_timestamp)
+        self.__push_job_allocation(job=job, node_ids=node_ids)
         self.__increase_num_jobs_per_source(source=job.source)
 
+    def __push_job_allocation(self, job, node_ids):
+        """
+        Put the job (with the assigned node ids) to the allocation heap.
+
+        @param job: Job object.
+        @type job: qss.core.job.Job
+        @param node_ids: List of ids of the assigned nodes.
+        @type node_ids: list
+        """
+        heapq.heappush(self.__jobs_allocation,
+                       (job.release_timestamp, self.__seq, job, node_ids))
+        self.__seq += 1
+
     def reset(self):
         """
         Reset all service nodes (set nodes to the idle state).
         """
-        if self.num_busy_nodes:
-            for node_id, node_state in enumerate(self.__nodes):
-                if node_state == NodeState.Busy:
-                    self.__nodes[node_id] = NodeState.Idle
+        if self.__num_busy:
+            self.__nodes = bytearray(self.__num_nodes)  # all nodes idle
+            self.__num_busy = 0
+            self.__idle_ids = set(range(self.__num_nodes))
 
         del self.__jobs_allocation[:]
         self.__num_jobs_per_source.clear()
@@ -213,17 +240,13 @@ class NodeManager(object):
         @param source: Source name of the job.
         @type source: str
         """
-        if source in self.__num_jobs_per_source:
-            self.__num_jobs_per_source[source] -= 1
-
-            if not self.__num_jobs_per_source[source]:
-                del self.__num_jobs_per_source[source]
+        self.__num_jobs_per_source[source] -= 1
 
     def get_num_jobs_with_source_names(self):
         """
         Get the number of jobs with corresponding source names.
 
         @return: Pairs of source names and the corresponding number of jobs.
-        @rtype: tuple(str, int)
+        @rtype: list((str, int))
         """
-        return self.__num_jobs_per_source.items()
+        return [(k, v) for k, v in self.__num_jobs_per_source.items() if v]
@@ -13,7 +13,7 @@
 # - Mikhail Titov, <mikhail.titov@cern.ch>, 2017-2018
 #
 
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
 from itertools import islice
 
 from .constants import QueueDiscipline
@@ -23,17 +23,31 @@ def fifo_queue_append(queue, element):
     queue.append(element)
 
 
+def fifo_queue_pop_next(queue):
+    return queue.popleft()
+
+
 def priority_queue_append(queue, element):
     element_idx = 0
-    for idx in xrange(len(queue) - 1, -1, -1):
+    for idx in range(len(queue) - 1, -1, -1):
         if queue[idx].priority >= element.priority:
             element_idx = idx + 1
             break
     queue.insert(element_idx, element)
 
 
+def priority_queue_pop_next(queue):
+    return queue.pop(0)
+
+
 class QueueManager(object):
 
+    __slots__ = ('__latest_queued_timestamp', '__queued_buffer_job',
+                 '__num_jobs_per_source', '__limits',
+                 '__total_limit', '__per_source_limit', '__discipline',
+                 '__queue', '__queue_append', '__queue_pop_next',
+                 '__job_init', '__buffer', '__num_buffered', '__num_dropped')
+
     def __init__(self, policy=None, limit=None, with_buffer=False):
         """
         Initialization (limits are applied to the queue, excluding the buffer).
@@ -45,25 +59,30 @@ class QueueManager(object):
         @param with_buffer: Flag to use the buffer (instead of dropping jobs).
         @type with_buffer: bool
         """
-        self.__queue = []
         self.__latest_queued_timestamp = 0.
         self.__queued_buffer_job = None
 
-        self.__num_jobs_per_source = defaultdict(int)
+        self.__num_jobs_per_source = Counter()
 
         policy = policy or {}
 
-        # queue limits
+        # queue limits ('add' is the hot path, thus limits are pre-fetched)
         self.__limits = policy.get('limit', {})
         if limit:
             self.__limits['_total'] = limit
+        self.__total_limit = self.__limits.get('_total')
+        self.__per_source_limit = self.__limits.get('_per_source')
 
         # queue discipline
         self.__discipline = policy.get('discipline', QueueDiscipline.FIFO)
         if self.__discipline == QueueDiscipline.FIFO:
+            self.__queue = deque()
             self.__queue_append = fifo_queue_append
+            self.__queue_pop_next = fifo_queue_pop_next
         elif self.__discipline == QueueDiscipline.Priority:
+            self.__queue = []
             self.__queue_append = priority_queue_append
+            self.__queue_pop_next = priority_queue_pop_next
         else:
             raise Exception('Queue discipline is unknown.')
 
@@ -76,8 +95,9 @@ class QueueManager(object):
             self.__job_init = job_init_dummy
 
         # buffer set up
+        self.__num_buffered = 0
         if with_buffer:
-            self.__buffer = defaultdict(list)
+            self.__buffer = defaultdict(deque)
             self.__num_dropped = None
         else:
             self.__buffer = None
@@ -87,15 +107,19 @@ class QueueManager(object):
         """
         Reset parameters.
         """
-        del self.__queue[:]
+        if self.__discipline == QueueDiscipline.FIFO:
+            self.__queue.clear()
+        else:
+            del self.__queue[:]
         self.__latest_queued_timestamp = 0.
         self.__queued_buffer_job = None
 
         self.__num_jobs_per_source.clear()
 
+        self.__num_buffered = 0
         if self.__buffer is not None:
             for source in self.__buffer:
-                del self.__buffer[source][:]
+                self.__buffer[source].clear()
 
         if self.__num_dropped is not None:
             for source in self.__num_dropped:
@@ -129,12 +153,7 @@ class QueueManager(object):
         @return: Number of jobs.
         @rtype: int
         """
-        output = 0
-
-        if self.__buffer is not None:
-            output = sum(map(lambda x: len(x), self.__buffer.values()))
-
-        return output
+        return self.__num_buffered
 
     @property
     def length_total(self):
@@ -176,11 +195,12 @@ class QueueManager(object):
         @rtype: list((str, int))
         """
         if not in_buffer:
-            output = self.__num_jobs_per_source.items()
+            output = [(k, v)
+                      for k, v in self.__num_jobs_per_source.items() if v]
         else:
             output = []
             if self.__buffer is not None:
-                output = map(lambda (k, v): (k, len(v)), self.__buffer.items())
+                output = [(k, len(v)) for k, v in self.__buffer.items()]
 
         return output
 
@@ -200,11 +220,7 @@ class QueueManager(object):
         @param source: Source name of the job.
         @type source: str
         """
-        if source in self.__num_jobs_per_source:
-            self.__num_jobs_per_source[source] -= 1
-
-            if not self.__num_jobs_per_source[source]:
-                del self.__num_jobs_per_source[source]
+        self.__num_jobs_per_source[source] -= 1
 
     @property
     def num_dropped(self):
@@ -245,12 +261,14 @@ class QueueManager(object):
         @param current_time: Current time (timestamp from 0 to now).
         @type current_time: float
         """
+        self.__job_init(job=job)
+
+        # lazy priority aging: every queued job ages at the same rate,
+        # so normalizing the priority to the queuing time keeps the
+        # relative order without updating all queued jobs on each add
         if self.__discipline == QueueDiscipline.Priority:
-            time_delta = current_time - self.__latest_queued_timestamp
-            for element in self.iterator():
-                element.increase_priority(value=time_delta)
+            job.increase_priority(value=-current_time)
 
-        self.__job_init(job=job)
         self.__queue_append(queue=self.__queue, element=job)
         self.__increase_num_jobs_per_source(source=job.source)
         self.__latest_queued_timestamp = current_time
@@ -264,6 +282,7 @@ class QueueManager(object):
         """
         if self.__buffer is not None:
             self.__buffer[job.source].append(job)
+            self.__num_buffered += 1
 
         elif self.__num_dropped is not None:
             self.__num_dropped[job.source] += 1
@@ -282,7 +301,8 @@ class QueueManager(object):
 
         # get the job (of the defined source name) from the buffer
         if self.get_num_jobs_per_source(source=source, in_buffer=True):
-            job_from_buffer = self.__buffer[source].pop(0)
+            job_from_buffer = self.__buffer[source].popleft()
+            self.__num_buffered -= 1
             self.add(job=job_from_buffer, current_time=current_time)
             self.__queued_buffer_job = job_from_buffer
 
@@ -304,21 +324,15 @@ class QueueManager(object):
 
         with_limit, has_free_spots = False, True
 
-        if '_total' in self.__limits:
-            if (self.__limits['_total'] - self.length) < 1:
+        if self.__total_limit is not None:
+            if (self.__total_limit - len(self.__queue)) < 1:
                 has_free_spots = False
             with_limit = True
 
-        if job.source in self.__limits:
-            source_limit_key = job.source
-        elif '_per_source' in self.__limits:
-            source_limit_key = '_per_source'
-        else:
-            source_limit_key = None
+        source_limit = self.__limits.get(job.source, self.__per_source_limit)
 
-        if has_free_spots and source_limit_key:
-            if (self.__limits[source_limit_key] -
-                    self.get_num_jobs_per_source(source=job.source)) < 1:
+        if has_free_spots and source_limit is not None:
+            if (source_limit - self.__num_jobs_per_source[job.source]) < 1:
                 has_free_spots = False
             with_limit = True
 
@@ -374,12 +388,39 @@ class QueueManager(object):
         @return: Job object.
         @rtype: qss.core.job.Job
         """
-        output = self.__queue.pop(0)
+        output = self.__queue_pop_next(self.__queue)
 
         self.__post_pop_job_per_source(source=output.source,
                                        current_time=current_time)
         return output
 
+    def get_next_batch(self, num_nodes, current_time):
+        """
+        Get (remove and return) jobs that fit the defined number of nodes
+        (jobs are taken in the queue order until the first one that does
+        not fit, i.e. the head-of-line blocking is preserved).
+
+        @param num_nodes: Number of idle service nodes.
+        @type num_nodes: int
+        @param current_time: Current time (timestamp from 0 to now).
+        @type current_time: float
+        @return: Job objects.
+        @rtype: list
+        """
+        output = []
+
+        queue = self.__queue
+        while queue and queue[0].num_nodes <= num_nodes:
+
+            job = self.__queue_pop_next(queue)
+            self.__post_pop_job_per_source(source=job.source,
+                                           current_time=current_time)
+
+            num_nodes -= job.num_nodes
+            output.append(job)
+
+        return output
+
     def pull(self, eid, current_time, **kwargs):
         """
         Get (remove and return) the particular job from the queue.
@@ -397,13 +438,15 @@ class QueueManager(object):
         output = None
 
         job_id, max_eid = kwargs.get('job_id'), len(self.__queue) - 1
-        if job_id and (eid > max_eid or id(self.__queue[eid]) != job_id):
+        if job_id and (eid > max_eid or self.__queue[eid].seq != job_id):
             for idx, job in enumerate(self.__queue):
-                if id(job) == job_id:
-                    output = self.__queue.pop(idx)
+                if job.seq == job_id:
+                    output = job
+                    del self.__queue[idx]
                     break
         elif eid <= max_eid:
-            output = self.__queue.pop(eid)
+            output = self.__queue[eid]
+            del self.__queue[eid]
         else:
             raise Exception('Defined job can not be located in the queue.')
 
@@ -22,6 +22,8 @@ THRESHOLD_NUMBER = 1000
 
 class NodeSchedule(object):
 
+    __slots__ = ('__timetable',)
+
     def __init__(self):
         """
         Initialization.
@@ -77,7 +79,7 @@ class NodeSchedule(object):
             except IndexError:
                 record = None
 
-            if ex_record[1] < start_timestamp:
+            if ex_record[1] is None or ex_record[1] < start_timestamp:
                 if record is None or end_timestamp < record[0]:
                     self.__timetable.insert(
                         idx, (start_timestamp, end_timestamp))
@@ -102,6 +104,8 @@ class NodeSchedule(object):
 
 class ScheduleManager(object):
 
+    __slots__ = ('__current_time', '__schedules', '__scheduled_start_data')
+
     def __init__(self, num_nodes):
         """
         Initialization.
@@ -140,7 +144,7 @@ class ScheduleManager(object):
 
         next_timestamps = []
         for sched_id, timestamps in enumerate(cumulative_start_timestamps):
-            timestamp, value = timestamps.next()
+            timestamp, value = next(timestamps)
             next_timestamps.append((timestamp, sched_id, value))
         next_timestamps.sort()
 
@@ -160,7 +164,7 @@ class ScheduleManager(object):
 
             try:
                 next_timestamp, next_value = \
-                    cumulative_start_timestamps[sched_id].next()
+                    next(cumulative_start_timestamps[sched_id])
             except StopIteration:
                 pass
             else:
@@ -224,7 +228,8 @@ class ScheduleManager(object):
                 end_timestamp=end_timestamp)
 
         if len(schedule_ids) < THRESHOLD_NUMBER:
-            map(insert_record, schedule_ids)
+            for schedule_id in schedule_ids:
+                insert_record(schedule_id)
         else:
             pool = ThreadPool(THREADS_NUMBER)
             pool.map(insert_record, schedule_ids)
@@ -237,7 +242,7 @@ class ScheduleManager(object):
                 break
             position_id += 1
         self.__scheduled_start_data.insert(position_id, (start_timestamp,
-                                                         id(job),
+                                                         job.seq,
                                                          schedule_ids))
 
     def set_initial_busy_times(self, node_release_timestamps, current_time):
@@ -13,6 +13,8 @@
 # - Mikhail Titov, <mikhail.titov@cern.ch>, 2017-2018
 #
 
+from bisect import bisect_right
+
 from .constants import StreamName
 from .core import QueueDiscipline
 
@@ -35,6 +37,13 @@ TITAN_REQUESTED_PROCESSOR_COUNT = {
         'aging_boost': 0.},
 }
 
+# precompiled group ranges (sorted by the lower bound of the nodes range):
+# (<min_num_nodes>, <max_num_nodes>, <group>, <aging_boost>)
+PRIORITY_GROUP_RANGES = tuple(sorted(
+    (v['nodes'][0], v['nodes'][1], k, v['aging_boost'])
+    for k, v in TITAN_REQUESTED_PROCESSOR_COUNT.items()))
+PRIORITY_GROUP_STARTS = tuple(x[0] for x in PRIORITY_GROUP_RANGES)
+
 
 def priority_queue_job_init(job):
     """
@@ -46,11 +55,11 @@ def priority_queue_job_init(job):
     if job.num_nodes > TITAN_NUM_NODES:
         raise Exception('Number of requested nodes exceeds the total number.')
 
-    for k, v in TITAN_REQUESTED_PROCESSOR_COUNT.iteritems():
-        if v['nodes'][0] <= job.num_nodes <= v['nodes'][1]:
-            job.group = k
-            job.priority = v['aging_boost']
-            break
+    num_nodes = job.num_nodes
+    idx = bisect_right(PRIORITY_GROUP_STARTS, num_nodes) - 1
+    if idx >= 0 and num_nodes <= PRIORITY_GROUP_RANGES[idx][1]:
+        job.group = PRIORITY_GROUP_RANGES[idx][2]
+        job.priority = PRIORITY_GROUP_RANGES[idx][3]
 
 
 QUEUE_POLICY = {
@@ -17,12 +17,46 @@ import math
 import os
 import random
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from .constants import StreamName
 from .core.job import Job
 
 NUM_NODES_DEFAULT = 1
 SOURCE_NAME_DEFAULT = StreamName.Default
 
+RANDOM_BUFFER_SIZE = 65536
+
+
+def exponential_generator(rate):
+    """
+    Yield exponentially distributed random values (with the defined rate).
+
+    If numpy is available then values are pre-generated in chunks (with
+    vectorized C code), otherwise values are produced one by one. Both
+    ways the sequence is governed by the [seed of the] stdlib generator.
+
+    @param rate: Rate parameter of the exponential distribution.
+    @type rate: float
+    @return: Random value.
+    @rtype: float
+    """
+    if numpy is not None:
+        # dedicated state seeded from the stdlib generator (the global
+        # numpy.random state is not controlled by random.seed)
+        state = numpy.random.RandomState(random.randrange(2 ** 32))
+        scale = 1. / rate
+        while True:
+            for value in state.exponential(scale, RANDOM_BUFFER_SIZE):
+                yield value
+    else:
+        scale, log, rnd = -1. / rate, math.log, random.random
+        while True:
+            yield scale * log(1. - rnd())
+
 
 def stream_generator(arrival_rate, execution_rate, num_nodes=None,
                      source=None, label=None, first_arrival_timestamp=None,
@@ -52,22 +86,23 @@ def stream_generator(arrival_rate, execution_rate, num_nodes=None,
     if not num_jobs and not time_limit:
         raise Exception('Limits are not set.')
 
-    def get_random(rate):
-        return (-1. / rate) * math.log(1. - random.random())
+    arrival_randoms = exponential_generator(rate=arrival_rate)
+    execution_randoms = exponential_generator(rate=execution_rate)
 
     num_nodes_per_job = num_nodes or NUM_NODES_DEFAULT
     source = source or SOURCE_NAME_DEFAULT
 
-    next_arrival_timestamp = first_arrival_timestamp or get_random(arrival_rate)
+    next_arrival_timestamp = (first_arrival_timestamp
+                              or next(arrival_randoms))
     while num_jobs or (time_limit and next_arrival_timestamp < time_limit):
 
         yield Job(arrival_timestamp=next_arrival_timestamp,
-                  execution_time=get_random(execution_rate),
+                  execution_time=next(execution_randoms),
                   num_nodes=num_nodes_per_job,
                   source=source,
                   label=label)
 
-        next_arrival_timestamp += get_random(arrival_rate)
+        next_arrival_timestamp += next(arrival_randoms)
 
         if num_jobs:
             num_jobs -= 1
@@ -100,18 +135,19 @@ def stream_generator_titan(arrival_rate, source=None, label=None,
 
     from .policy import TITAN_REQUESTED_PROCESSOR_COUNT
 
-    def get_random(rate):
-        return (-1. / rate) * math.log(1. - random.random())
+    arrival_randoms = exponential_generator(rate=arrival_rate)
+
+    uniform, log, rnd = random.uniform, math.log, random.random
 
     def get_random_range(start, end):
         if start < end:
-            return (-1. * random.uniform(start, end) *
-                    math.log(1. - random.random()))
+            return -1. * uniform(start, end) * log(1. - rnd())
 
     source = source or SOURCE_NAME_DEFAULT
     groups = TITAN_REQUESTED_PROCESSOR_COUNT.keys()
 
-    next_arrival_timestamp = first_arrival_timestamp or get_random(arrival_rate)
+    next_arrival_timestamp = (first_arrival_timestamp
+                              or next(arrival_randoms))
     while num_jobs or (time_limit and next_arrival_timestamp < time_limit):
 
         val = TITAN_REQUESTED_PROCESSOR_COUNT[random.randint(groups)]
@@ -124,7 +160,7 @@ def stream_generator_titan(arrival_rate, source=None, label=None,
                   source=source,
                   label=label)
 
-        next_arrival_timestamp += get_random(arrival_rate)
+        next_arrival_timestamp += next(arrival_randoms)
 
         if num_jobs:
             num_jobs -= 1
@@ -11,3 +11,4 @@
 #
 
 from .enum import EnumTypes
+from .stats import time_weighted_average
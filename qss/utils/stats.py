@@ -0,0 +1,63 @@
+#
+# Copyright European Organization for Nuclear Research (CERN)
+#           National Research Centre "Kurchatov Institute"
+#           Rutgers University
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _time_weighted_average(timestamps, values):
+    output = 0.
+
+    if len(timestamps) and (timestamps[-1] - timestamps[0]):
+        for i in range(len(timestamps) - 1):
+            output += values[i] * (timestamps[i + 1] - timestamps[i])
+        output = output / (timestamps[-1] - timestamps[0])
+
+    return output
+
+
+if njit is not None:
+    _time_weighted_average = njit(cache=True)(_time_weighted_average)
+
+
+def time_weighted_average(timestamps, values):
+    """
+    Get the time-weighted average of the values over the observed period
+    (every value is weighted by the time until the next timestamp).
+
+    If numpy is available then the average is computed with one
+    vectorized dot product, otherwise with a plain (possibly
+    numba-compiled) accumulation loop.
+
+    @param timestamps: Timestamps of the observations (increasing order).
+    @type timestamps: sequence of floats
+    @param values: Observed values (one per timestamp).
+    @type values: sequence of numbers
+    @return: Average value.
+    @rtype: float
+    """
+    if numpy is not None and len(timestamps) > 1:
+        t = numpy.asarray(timestamps, dtype=numpy.float64)
+        duration = t[-1] - t[0]
+        if not duration:
+            return 0.
+        v = numpy.asarray(values, dtype=numpy.float64)
+        return float(numpy.dot(numpy.diff(t), v[:-1]) / duration)
+
+    return _time_weighted_average(timestamps, values)